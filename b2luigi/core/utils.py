@@ -4,6 +4,7 @@ import importlib
 import itertools
 import os
 import collections
+from collections.abc import Iterable
 import sys
 import types
 import warnings
@@ -48,7 +49,7 @@ def product_dict(**kwargs):
     Return:
         A list of kwargs where each list of input keyword arguments is cross-multiplied with every other.
     """
-    keys = kwargs.keys()
+    keys = tuple(kwargs)
     vals = kwargs.values()
     for instance in itertools.product(*vals):
         yield dict(zip(keys, instance))
@@ -71,7 +72,7 @@ def fill_kwargs_with_lists(**kwargs):
     for key, value in kwargs.items():
         if value is None:
             value = []
-        if isinstance(value, str) or not isinstance(value, collections.Iterable):
+        if not isinstance(value, (list, tuple)) and (isinstance(value, str) or not isinstance(value, Iterable)):
             value = [value]
         return_kwargs[key] = value
 
@@ -95,7 +96,8 @@ def flatten_to_file_paths(inputs):
         pass
 
     if isinstance(inputs, dict):
-        return {os.path.basename(flatten_to_file_paths(key)):
+        # Most keys are plain strings already, which do not need to be descended into
+        return {os.path.basename(key if isinstance(key, str) else flatten_to_file_paths(key)):
                 flatten_to_file_paths(value) for key, value in inputs.items()}
     if isinstance(inputs, list):
         return [flatten_to_file_paths(value) for value in inputs]
@@ -123,8 +125,7 @@ def flatten_to_dict(inputs):
 
     joined_dict = {}
     for i in inputs:
-        for key, value in i.items():
-            joined_dict[key] = value
+        joined_dict.update(i)
     return joined_dict
 
 
@@ -139,17 +140,28 @@ def flatten_to_list_of_dicts(inputs):
     return dict(joined_dict)
 
 
-def task_iterator(task, only_non_complete=False):
+def task_iterator(task, only_non_complete=False, _seen=None):
+    # Tasks shared by several branches of the graph are only visited (and yielded) once
+    if _seen is None:
+        _seen = set()
+
+    if task.task_id in _seen:
+        return
+    _seen.add(task.task_id)
+
     if not only_non_complete or not task.complete():
         yield task
         for dep in task.deps():
-            yield from task_iterator(dep, only_non_complete=only_non_complete)
+            yield from task_iterator(dep, only_non_complete=only_non_complete, _seen=_seen)
 
 
 def get_all_output_files_in_tree(root_module, key=None):
     if key:
         return get_all_output_files_in_tree(root_module)[key]
 
+    # Same as os.path.abspath for every file, but without looking up the cwd each time
+    cwd = os.getcwd()
+
     all_output_files = collections.defaultdict(list)
     for task in task_iterator(root_module):
         output_dict = flatten_to_dict(task.output())
@@ -162,41 +174,65 @@ def get_all_output_files_in_tree(root_module, key=None):
 
             all_output_files[file_key].append(dict(exists=target.exists(),
                                                    parameters=get_serialized_parameters(task),
-                                                   file_name=os.path.abspath(file_name)))
+                                                   file_name=os.path.normpath(os.path.join(cwd, file_name))))
 
     return all_output_files
 
 
 def filter_from_params(output_files, **kwargs):
+    """
+    Return only those output files, whose parameters match the given values.
+    An output file is kept if each of its parameters, which is filtered on, has one of the given values.
+    Parameters not set on an output file are not filtered on.
+
+    The output files are returned in their input order. For output files with the same file name,
+    the last one is kept.
+
+    :param output_files: List of output file dicts, as returned by ``get_all_output_files_in_tree``
+    :param kwargs: Each keyword argument is a value or a list of values to keep for this parameter
+    :return: The matching output file dicts, unique in their file name
+    """
     kwargs_list = fill_kwargs_with_lists(**kwargs)
 
     if not kwargs_list:
         return output_files
 
-    file_names = []
+    allowed_values = {key: {str(value) for value in values} for key, values in kwargs_list.items()}
 
-    for kwargs in product_dict(**kwargs_list):
-        for output_dict in output_files:
-            parameters = output_dict["parameters"]
+    file_names = {}
 
-            not_use = False
-            for key, value in kwargs.items():
-                if key in parameters and str(parameters[key]) != str(value):
-                    not_use = True
-                    break
+    for output_dict in output_files:
+        parameters = output_dict["parameters"]
 
-            if not_use:
-                continue
+        if all(str(parameters[key]) in values for key, values in allowed_values.items() if key in parameters):
+            file_names[output_dict["file_name"]] = output_dict
 
-            file_names.append(output_dict)
+    return file_names.values()
 
-    return {x["file_name"]: x for x in file_names}.values()
+
+_task_module_cache = {}
 
 
 def get_task_from_file(file_name, task_name, **kwargs):
-    spec = importlib.util.spec_from_file_location("module.name", os.path.basename(file_name))
-    task_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(task_module)
+    file_name = os.path.abspath(file_name)
+    dir_name = os.path.dirname(file_name)
+
+    # Executing the module again for every task is expensive, so only do it once per file
+    # (and again if the file has been modified in the meantime, replacing the outdated module)
+    mtime = os.stat(file_name).st_mtime_ns
+    cached_mtime, task_module = _task_module_cache.get(file_name, (None, None))
+    if cached_mtime != mtime:
+        spec = importlib.util.spec_from_file_location("module.name", file_name)
+        task_module = importlib.util.module_from_spec(spec)
+
+        # Make modules next to the file importable without changing the (process-wide) cwd
+        sys.path.insert(0, dir_name)
+        try:
+            spec.loader.exec_module(task_module)
+        finally:
+            sys.path.remove(dir_name)
+
+        _task_module_cache[file_name] = (mtime, task_module)
 
     m = getattr(task_module, task_name)(**kwargs)
 
@@ -205,6 +241,11 @@ def get_task_from_file(file_name, task_name, **kwargs):
 
 def get_serialized_parameters(task):
     """Get a string-typed ordered dict of key=value for the significant parameters"""
+    # Parameters do not change after creation, so serialize them only once per task instance
+    cached_parameters = getattr(task, "_b2luigi_serialized_parameters", None)
+    if cached_parameters is not None:
+        return collections.OrderedDict(cached_parameters)
+
     serialized_parameters = collections.OrderedDict()
 
     for key, parameter in task.get_params():
@@ -219,7 +260,9 @@ def get_serialized_parameters(task):
 
         serialized_parameters[key] = value
 
-    return serialized_parameters
+    task._b2luigi_serialized_parameters = serialized_parameters
+
+    return collections.OrderedDict(serialized_parameters)
 
 
 def create_output_file_name(task, base_filename, result_dir=None):
@@ -235,10 +278,14 @@ def create_output_file_name(task, base_filename, result_dir=None):
                           "This will result in an additional subdirectory in the output path. "
                           "Consider using a hashed parameter (e.g. ``b2luigi.Parameter(hashed=True)``)")
 
+    if os.path.isabs(base_filename):
+        return base_filename
+
+    # None of the key=value parts can be absolute, so they can be joined directly instead of via os.path.join
     param_list = [f"{key}={value}" for key, value in serialized_parameters.items()]
-    output_path = os.path.join(result_dir, *param_list)
+    param_list.append(base_filename)
 
-    return os.path.join(output_path, base_filename)
+    return os.path.join(result_dir, os.sep.join(param_list))
 
 
 def get_log_file_dir(task):
@@ -301,12 +348,28 @@ def _flatten(struct):
 
     result = []
     try:
-        iterator = iter(struct)
+        stack = [iter(struct)]
     except TypeError:
         return [struct]
 
-    for f in iterator:
-        result += _flatten(f)
+    # Walk the nested iterables depth-first with an explicit stack of iterators,
+    # so the leaves end up in the same order as with a recursive descent
+    while stack:
+        for f in stack[-1]:
+            if isinstance(f, dict) or isinstance(f, str):
+                result.append(f)
+                continue
+
+            try:
+                iterator = iter(f)
+            except TypeError:
+                result.append(f)
+                continue
+
+            stack.append(iterator)
+            break
+        else:
+            stack.pop()
 
     return result
 
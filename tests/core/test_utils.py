@@ -1,7 +1,14 @@
-from unittest import TestCase
+import os
+import sys
+from unittest import TestCase, mock
 
+from luigi.parameter import ParameterVisibility
+
+import b2luigi
 from b2luigi.core import utils
 
+from ..helpers import B2LuigiTestCase
+
 
 class ProductDictTestCase(TestCase):
     def test_basic_usage(self):
@@ -144,4 +151,216 @@ class FlattenTestCase(TestCase):
         self.assertIn("key1", outputs)
         self.assertEqual(outputs["key1"], ["value1", "repeated"])
         self.assertIn("key2", outputs)
-        self.assertEqual(outputs["key2"], ["value2"])
\ No newline at end of file
+        self.assertEqual(outputs["key2"], ["value2"])
+
+    def test_nested_input_order(self):
+        inputs = [["value1", ["value2", ("value3", {"key4": "value4"})]], [], "value5", [[["value6"]]]]
+
+        outputs = utils.flatten_to_list_of_dicts(inputs)
+
+        self.assertEqual(list(outputs), ["value1", "value2", "value3", "key4", "value5", "value6"])
+
+
+class TaskIteratorTestCase(TestCase):
+    def test_shared_dependencies(self):
+        class LeafTask(b2luigi.Task):
+            pass
+
+        class MiddleTask(b2luigi.Task):
+            some_parameter = b2luigi.IntParameter()
+
+            def requires(self):
+                yield LeafTask()
+
+        class RootTask(b2luigi.Task):
+            def requires(self):
+                yield MiddleTask(some_parameter=1)
+                yield MiddleTask(some_parameter=2)
+
+        task_ids = [task.task_id for task in utils.task_iterator(RootTask())]
+
+        self.assertEqual(len(task_ids), 4)
+        self.assertEqual(len(set(task_ids)), 4)
+        self.assertEqual(task_ids[0], RootTask().task_id)
+        self.assertIn(LeafTask().task_id, task_ids)
+
+
+class SerializedParametersTestCase(TestCase):
+    def test_cached_parameters(self):
+        class SomeTask(b2luigi.Task):
+            first_arg = b2luigi.IntParameter()
+            second_arg = b2luigi.Parameter(significant=False)
+
+        task = SomeTask(first_arg=1, second_arg="a")
+
+        serialized_parameters = utils.get_serialized_parameters(task)
+        self.assertEqual(serialized_parameters, {"first_arg": "1"})
+
+        serialized_parameters["first_arg"] = "2"
+        self.assertEqual(utils.get_serialized_parameters(task), {"first_arg": "1"})
+
+    def test_private_parameters(self):
+        class SomeTask(b2luigi.Task):
+            first_arg = b2luigi.IntParameter()
+            private_arg = b2luigi.Parameter(visibility=ParameterVisibility.PRIVATE)
+
+        task = SomeTask(first_arg=1, private_arg="x")
+        other_task = SomeTask(first_arg=1, private_arg="y")
+        self.assertEqual(task.task_id, other_task.task_id)
+
+        self.assertEqual(utils.get_serialized_parameters(task), {"first_arg": "1", "private_arg": "x"})
+        self.assertEqual(utils.get_serialized_parameters(other_task), {"first_arg": "1", "private_arg": "y"})
+        self.assertEqual(utils.create_output_file_name(other_task, "out", result_dir="results"),
+                         os.path.join("results", "first_arg=1", "private_arg=y", "out"))
+
+
+class FilterFromParamsTestCase(TestCase):
+    def test_basic_usage(self):
+        output_files = [
+            dict(file_name="a", parameters={"first_arg": "1", "second_arg": "a"}),
+            dict(file_name="b", parameters={"first_arg": "2", "second_arg": "a"}),
+            dict(file_name="c", parameters={"first_arg": "3", "second_arg": "b"}),
+            dict(file_name="d", parameters={"other_arg": "x"}),
+        ]
+
+        file_names = [x["file_name"] for x in utils.filter_from_params(output_files, first_arg=[1, 2])]
+        self.assertEqual(file_names, ["a", "b", "d"])
+
+        file_names = [x["file_name"] for x in utils.filter_from_params(output_files, first_arg=[1, 3],
+                                                                        second_arg="a")]
+        self.assertEqual(file_names, ["a", "d"])
+
+        file_names = [x["file_name"] for x in utils.filter_from_params(output_files, first_arg=[])]
+        self.assertEqual(file_names, ["d"])
+
+        file_names = [x["file_name"] for x in utils.filter_from_params(output_files)]
+        self.assertEqual(file_names, ["a", "b", "c", "d"])
+
+    def test_order(self):
+        output_files = [
+            dict(file_name="a", parameters={"first_arg": "1"}),
+            dict(file_name="b", parameters={"first_arg": "2"}),
+            dict(file_name="a", parameters={"first_arg": "3"}),
+            dict(file_name="c", parameters={"other_arg": "x"}),
+        ]
+
+        outputs = list(utils.filter_from_params(output_files, first_arg=[3, 2, 1]))
+        self.assertEqual([x["file_name"] for x in outputs], ["a", "b", "c"])
+        self.assertIs(outputs[0], output_files[2])
+
+
+class FillKwargsWithListsTestCase(TestCase):
+    def test_basic_usage(self):
+        kwargs = utils.fill_kwargs_with_lists(first_arg=[1, 2], second_arg=3, third_arg="abc",
+                                              fourth_arg=(4, 5), fifth_arg=None)
+
+        self.assertEqual(kwargs, {"first_arg": [1, 2], "second_arg": [3], "third_arg": ["abc"],
+                                  "fourth_arg": (4, 5), "fifth_arg": []})
+
+
+class FlattenToFilePathsTestCase(TestCase):
+    def test_basic_usage(self):
+        inputs = {"some/path/key1": b2luigi.LocalTarget("some/path/value1"),
+                  b2luigi.LocalTarget("other/path/key2"): [b2luigi.LocalTarget("other/path/value2"), "value3"]}
+
+        outputs = utils.flatten_to_file_paths(inputs)
+
+        self.assertEqual(outputs, {"key1": "some/path/value1", "key2": ["other/path/value2", "value3"]})
+
+
+class GetTaskFromFileTestCase(B2LuigiTestCase):
+    def setUp(self):
+        super().setUp()
+
+        # Start from an empty module cache and restore it afterwards, so no modules from deleted folders are kept
+        module_cache_patcher = mock.patch.dict(utils._task_module_cache, clear=True)
+        module_cache_patcher.start()
+        self.addCleanup(module_cache_patcher.stop)
+
+    def write_task_file(self, file_name, default):
+        with open(file_name, "w") as f:
+            f.write("import b2luigi\n\n\n"
+                    "class FileTask(b2luigi.Task):\n"
+                    f"    some_parameter = b2luigi.IntParameter(default={default})\n")
+
+    def test_module_cache(self):
+        file_name = os.path.join(self.test_dir, "task_file.py")
+        self.write_task_file(file_name, 1)
+
+        task = utils.get_task_from_file(file_name, "FileTask")
+        self.assertEqual(task.some_parameter, 1)
+
+        other_task = utils.get_task_from_file(file_name, "FileTask", some_parameter=2)
+        self.assertEqual(other_task.some_parameter, 2)
+        self.assertIs(type(task), type(other_task))
+
+        self.write_task_file(file_name, 3)
+        stat = os.stat(file_name)
+        os.utime(file_name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+        task = utils.get_task_from_file(file_name, "FileTask")
+        self.assertEqual(task.some_parameter, 3)
+        self.assertIsNot(type(task), type(other_task))
+        # The outdated module is replaced, not kept in addition
+        self.assertEqual(list(utils._task_module_cache), [file_name])
+
+    def test_other_directory(self):
+        task_dir = os.path.join(self.test_dir, "task_dir")
+        os.makedirs(task_dir)
+        with open(os.path.join(task_dir, "task_file_helper_module.py"), "w") as f:
+            f.write("DEFAULT = 4\n")
+        with open(os.path.join(task_dir, "task_file.py"), "w") as f:
+            f.write("import b2luigi\n"
+                    "from task_file_helper_module import DEFAULT\n\n\n"
+                    "class FileTask(b2luigi.Task):\n"
+                    "    some_parameter = b2luigi.IntParameter(default=DEFAULT)\n")
+        self.addCleanup(sys.modules.pop, "task_file_helper_module", None)
+
+        task = utils.get_task_from_file(os.path.join("task_dir", "task_file.py"), "FileTask")
+
+        self.assertEqual(task.some_parameter, 4)
+        self.assertEqual(os.getcwd(), self.test_dir)
+        self.assertNotIn(task_dir, sys.path)
+
+
+class CreateOutputFileNameTestCase(TestCase):
+    def test_basic_usage(self):
+        class SomeTask(b2luigi.Task):
+            first_arg = b2luigi.IntParameter()
+            second_arg = b2luigi.Parameter()
+
+        task = SomeTask(first_arg=1, second_arg="a")
+
+        self.assertEqual(utils.create_output_file_name(task, "out.root", result_dir="results/"),
+                         os.path.join("results", "first_arg=1", "second_arg=a", "out.root"))
+        self.assertEqual(utils.create_output_file_name(task, "SomeTask/", result_dir="/abs/results"),
+                         os.path.join("/abs/results", "first_arg=1", "second_arg=a", "SomeTask/"))
+        self.assertEqual(utils.create_output_file_name(task, "/abs/out.root", result_dir="results"),
+                         "/abs/out.root")
+
+
+class GetAllOutputFilesInTreeTestCase(B2LuigiTestCase):
+    def test_basic_usage(self):
+        class LeafTask(b2luigi.Task):
+            some_parameter = b2luigi.IntParameter()
+
+            def output(self):
+                yield {"leaf.txt": b2luigi.LocalTarget(os.path.join("results", f"leaf_{self.some_parameter}.txt"))}
+
+        class RootTask(b2luigi.Task):
+            def requires(self):
+                yield LeafTask(some_parameter=1)
+                yield LeafTask(some_parameter=2)
+
+            def output(self):
+                yield {"root.txt": b2luigi.LocalTarget("root.txt")}
+
+        output_files = utils.get_all_output_files_in_tree(RootTask())
+
+        self.assertEqual(len(output_files["root.txt"]), 1)
+        self.assertEqual(len(output_files["leaf.txt"]), 2)
+
+        file_names = sorted(d["file_name"] for d in output_files["leaf.txt"])
+        self.assertEqual(file_names, [os.path.join(os.getcwd(), "results", f"leaf_{i}.txt") for i in (1, 2)])
+        for d in output_files["leaf.txt"]:
+            self.assertFalse(d["exists"])